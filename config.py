@@ -6,6 +6,9 @@ PROJECT_ID = "YOUR_PROJECT_NAME"
 # Look back period in days for Audit Logs
 DAYS_BACK = 30
 
+# How long (seconds) gcloud listings are reused from the on-disk cache across runs (0 = disabled)
+GCLOUD_CACHE_TTL_SECONDS = 600
+
 # Mapping from Billing Report 'Service description' to Cloud Logging 'serviceName'
 # This maps the human-readable name in your CSV to the internal API name.
 SERVICE_MAPPING = {
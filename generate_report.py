@@ -1,37 +1,62 @@
 import os
-# Force REST transport to avoid gRPC IOCP/Socket errors on Windows
-os.environ["GOOGLE_CLOUD_DISABLE_GRPC"] = "true"
-
-from google.cloud import logging
+import asyncio
+import aiohttp
+import google.auth
+import google.auth.transport.requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import config
 from datetime import datetime, timedelta, timezone
 import sys
-import glob
-import time
 
-def get_logging_client():
+# Cloud Logging REST endpoint (called directly so services can be scanned concurrently)
+LOGGING_ENTRIES_URL = "https://logging.googleapis.com/v2/entries:list"
+LOGGING_SCOPES = ["https://www.googleapis.com/auth/logging.read"]
+
+# Only download the fields the report reads (partial response). protoPayload is an Any,
+# so it is selected whole rather than masking inside it.
+LOGGING_ENTRY_FIELDS = "entries(timestamp,protoPayload),nextPageToken"
+
+# Columns of the per-event rows built by to_creation_rows
+CREATION_COLUMNS = ["Service", "API Service", "Resource Name", "Created By", "Timestamp", "Method"]
+
+# Our own (and resource_cost_breakdown.py's) output CSVs — never treat these as billing input
+EXCLUDED_CSV_MARKERS = ("gcp_created_resources", "top_10", "gcp_creation_audit_report", "gcp_", "resource_cost", "person_cost")
+
+# Max number of in-flight Logging API requests (be nice to the API)
+MAX_CONCURRENT_REQUESTS = 5
+
+def get_logging_credentials():
+    """Returns refreshed Application Default Credentials for the Logging API."""
     try:
-        return logging.Client(project=config.PROJECT_ID)
+        credentials, _ = google.auth.default(scopes=LOGGING_SCOPES)
+        credentials.refresh(google.auth.transport.requests.Request())
+        return credentials
     except Exception as e:
-        print(f"Failed to create Logging client: {e}")
+        print(f"Failed to obtain Logging credentials: {e}")
         return None
 
 def find_billing_csv():
     """Finds the most recent Billing CSV."""
-    csv_files = glob.glob("*.csv")
-    input_csvs = [f for f in csv_files if "gcp_created_resources" not in f and "top_10" not in f and "gcp_creation_audit_report" not in f]
-    
-    if not input_csvs:
-        return None
-    return input_csvs[0]
+    with os.scandir(".") as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith(".csv") and entry.is_file() and not any(marker in name for marker in EXCLUDED_CSV_MARKERS):
+                return name
+    return None
 
 def analyze_billing_data(csv_path):
     print(f"Reading billing data from: {csv_path}")
     try:
-        df = pd.read_csv(csv_path)
-        if "Cost ($)" in df.columns:
-            df["Cost ($)"] = df["Cost ($)"].replace(r'[$,]', '', regex=True).astype(float)
+        # Only parse the columns we need; Cost is read as text ("$1,234.56") and cleaned once
+        df = pd.read_csv(
+            csv_path,
+            engine="pyarrow",
+            usecols=["Service description", "SKU description", "Cost ($)"],
+            dtype={"Service description": "string", "SKU description": "string", "Cost ($)": "string"},
+        )
+        df["Cost ($)"] = df["Cost ($)"].str.replace(r'[$,]', '', regex=True).astype(float)
             
         # Group by Service AND SKU to get top cost drivers at SKU level
         top_sku_df = df.groupby(["Service description", "SKU description"])["Cost ($)"].sum().reset_index()
@@ -45,21 +70,13 @@ def analyze_billing_data(csv_path):
         print(f"Error analyzing billing CSV: {e}")
         return pd.DataFrame()
 
-def fetch_logs_for_service(client, human_service_name, timestamp_filter):
-    """Fetches logs for a single service to avoid 500 errors from complex queries."""
-    
-    api_service = config.SERVICE_MAPPING.get(human_service_name)
-    if not api_service:
-        print(f"Skipping {human_service_name} (No API mapping found)")
-        return []
-
-    print(f"Scanning logs for {human_service_name} ({api_service})...")
-
-    # Filter for this specific service
-    filter_str = f"""
+def build_audit_filter(api_services, timestamp_filter):
+    """Audit-log filter for resource creation events of the given API services."""
+    service_clause = " OR ".join(f'"{api_service}"' for api_service in api_services)
+    return f"""
         logName="projects/{config.PROJECT_ID}/logs/cloudaudit.googleapis.com%2Factivity"
         AND timestamp >= "{timestamp_filter}"
-        AND protoPayload.serviceName="{api_service}"
+        AND protoPayload.serviceName=({service_clause})
         AND (
             protoPayload.methodName:"create" OR 
             protoPayload.methodName:"insert" OR 
@@ -69,32 +86,113 @@ def fetch_logs_for_service(client, human_service_name, timestamp_filter):
         )
     """
 
+async def list_audit_entries(session, filter_str):
+    """Pages through entries:list for filter_str and returns all raw entries."""
+    body = {
+        "resourceNames": [f"projects/{config.PROJECT_ID}"],
+        "filter": filter_str,
+        "pageSize": 1000,  # API max — fewer round-trips
+        "orderBy": "timestamp desc",
+    }
+
+    entries = []
+    while True:
+        async with session.post(LOGGING_ENTRIES_URL, json=body, params={"fields": LOGGING_ENTRY_FIELDS}) as response:
+            response.raise_for_status()
+            page = await response.json()
+
+        entries.extend(page.get("entries", []))
+
+        # Follow pagination until the last page
+        next_page = page.get("nextPageToken")
+        if not next_page:
+            return entries
+        body["pageToken"] = next_page
+
+def to_creation_rows(entries, services_by_api):
+    """Turns raw audit entries into CREATION_COLUMNS tuples, one per matching human service name."""
+    data = []
+    for entry in entries:
+        payload = entry.get("protoPayload")
+        if not payload: continue
+
+        api_service = payload.get('serviceName')
+        for human_service_name in services_by_api.get(api_service, []):
+            # One tuple per event, in CREATION_COLUMNS order
+            data.append((
+                human_service_name,
+                api_service,
+                payload.get('resourceName', 'Unknown'),
+                (payload.get('authenticationInfo') or {}).get('principalEmail', 'Unknown'),
+                entry.get('timestamp'),
+                payload.get('methodName', 'Unknown'),
+            ))
+    return data
+
+async def fetch_logs_for_service(session, semaphore, human_service_name, timestamp_filter):
+    """Fetches logs for a single service (fallback when the combined query fails)."""
+    
+    api_service = config.SERVICE_MAPPING[human_service_name]
+    print(f"Scanning logs for {human_service_name} ({api_service})...")
+
     data = []
     try:
-        entries = client.list_entries(filter_=filter_str, page_size=50)
-        
-        for entry in entries:
-            payload = entry.payload
-            if not payload: continue
-            
-            try:
-                data.append({
-                    'Service': human_service_name,
-                    'API Service': api_service,
-                    'Resource Name': payload.get('resourceName', 'Unknown'),
-                    'Created By': payload.get('authenticationInfo', {}).get('principalEmail', 'Unknown'),
-                    'Timestamp': entry.timestamp,
-                    'Method': payload.get('methodName', 'Unknown')
-                })
-            except:
-                continue
-                
+        async with semaphore:
+            entries = await list_audit_entries(session, build_audit_filter([api_service], timestamp_filter))
+        data = to_creation_rows(entries, {api_service: [human_service_name]})
     except Exception as e:
         print(f"  Warning: Failed to query {human_service_name}: {e}")
     
-    print(f"  Found {len(data)} events.")
+    print(f"  Found {len(data)} events for {human_service_name}.")
     return data
 
+async def fetch_logs_for_services(credentials, service_names, timestamp_filter):
+    """Scans all services with one combined query, falling back to concurrent per-service queries."""
+    # API name → human names (several billing services share an API, e.g. Gemini API / Vertex AI)
+    services_by_api = {}
+    for service_name in service_names:
+        api_service = config.SERVICE_MAPPING.get(service_name)
+        if not api_service:
+            print(f"Skipping {service_name} (No API mapping found)")
+            continue
+        services_by_api.setdefault(api_service, []).append(service_name)
+
+    if not services_by_api:
+        return []
+
+    headers = {"Authorization": f"Bearer {credentials.token}"}
+    # User ADC (gcloud auth application-default login) bills API calls to its quota project,
+    # as the google-cloud-logging client did — not to gcloud's shared OAuth client project
+    quota_project_id = getattr(credentials, "quota_project_id", None)
+    if quota_project_id:
+        headers["x-goog-user-project"] = quota_project_id
+    connector = aiohttp.TCPConnector(limit=20)
+
+    async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+        print(f"Scanning logs for {len(services_by_api)} APIs in one query...")
+        try:
+            entries = await list_audit_entries(session, build_audit_filter(list(services_by_api), timestamp_filter))
+            all_data = to_creation_rows(entries, services_by_api)
+            print(f"  Found {len(all_data)} events.")
+            return all_data
+        except Exception as e:
+            print(f"  Warning: Combined query failed ({e}). Falling back to per-service queries...")
+
+        scan_names = [name for names in services_by_api.values() for name in names]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        results = await asyncio.gather(
+            *[fetch_logs_for_service(session, semaphore, name, timestamp_filter) for name in scan_names],
+            return_exceptions=True
+        )
+
+    all_data = []
+    for service_name, result in zip(scan_names, results):
+        if isinstance(result, Exception):
+            print(f"  Warning: Failed to query {service_name}: {result}")
+            continue
+        all_data.extend(result)
+    return all_data
+
 def main():
     print(f"Target Project: {config.PROJECT_ID}")
     
@@ -107,54 +205,55 @@ def main():
     if top_skus_df.empty: return
 
     # Save Top 10 SKUs to a file for reference
-    top_skus_df.to_excel("top_10_cost_skus.xlsx", index=False)
+    top_skus_df.to_excel("top_10_cost_skus.xlsx", index=False, engine="xlsxwriter")
     print("Saved 'top_10_cost_skus.xlsx'")
         
-    client = get_logging_client()
-    if not client: return
+    credentials = get_logging_credentials()
+    if not credentials: return
 
     # Calculate timestamp once
     start_time = datetime.now(timezone.utc) - timedelta(days=config.DAYS_BACK)
     timestamp_filter = start_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
     
-    all_data = []
-    
     # Get unique services from the Top SKUs to scan
     # We scan the *Service* because Audit Logs are at the Service level, not SKU level.
     unique_services_to_scan = top_skus_df["Service description"].unique().tolist()
     
-    for service_name in unique_services_to_scan:
-        service_data = fetch_logs_for_service(client, service_name, timestamp_filter)
-        all_data.extend(service_data)
-        time.sleep(1) # Be nice to the API
+    all_data = asyncio.run(fetch_logs_for_services(credentials, unique_services_to_scan, timestamp_filter))
         
     if not all_data:
         print("\nNo creation logs found for any of the top services.")
         # Still output the Top SKUs even if no logs found
-        top_skus_df.to_excel("gcp_top_cost_skus_report.xlsx", index=False)
+        top_skus_df.to_excel("gcp_top_cost_skus_report.xlsx", index=False, engine="xlsxwriter")
     else:
-        creation_df = pd.DataFrame(all_data)
-        creation_df['Timestamp'] = creation_df['Timestamp'].astype(str)
+        creation_df = pd.DataFrame(all_data, columns=CREATION_COLUMNS)
+        # Real datetimes (UTC, tz-naive for Excel) instead of strings, so min/max stay numeric
+        creation_df['Timestamp'] = pd.to_datetime(creation_df['Timestamp'], utc=True, format="ISO8601").dt.tz_localize(None)
         
-        # MERGE & AGGREGATE
-        # 1. Merge the data first
-        merged_df = pd.merge(
-            top_skus_df, 
-            creation_df, 
-            left_on="Service description", 
-            right_on="Service", 
-            how="left"
-        )
+        # AGGREGATE PER SERVICE, THEN ATTACH TO SKUs
+        # Audit Logs are at the Service level, so summarize each Service once
+        # (creators: mohit(5), ahmed(2) / resource count / date range)
+        # Count events per (Service, creator), most active creator first
+        creator_counts = creation_df.groupby(["Service", "Created By"]).size().reset_index(name="n")
+        creator_counts = creator_counts.sort_values(["Service", "n"], ascending=[True, False], kind="stable")
+        creator_counts["tag"] = creator_counts["Created By"] + "(" + creator_counts["n"].astype(str) + ")"
 
-        # 2. Aggregate rows so each SKU appears only once
-        # We group by the Billing Columns (Service, SKU, Cost)
-        final_df = merged_df.groupby(["Service description", "SKU description", "Cost ($)"]).agg({
-            "Created By": lambda x: ", ".join([f"{k}({v})" for k, v in x.value_counts().items()]), # Summarize creators: mohit(5), ahmed(2)
-            "Resource Name": "count", # Count total resources created
-            "Timestamp": ["min", "max"] # Show date range
-        }).reset_index()
+        # Numeric reductions run as an Arrow hash aggregation on a narrow table
+        # (key + count/datetime columns only); the creators string is attached separately
+        events = pa.Table.from_pandas(creation_df[["Service", "Resource Name", "Timestamp"]], preserve_index=False)
+        service_summary = (
+            events.group_by("Service")
+            .aggregate([("Resource Name", "count"), ("Timestamp", "min"), ("Timestamp", "max")])
+            .to_pandas()
+            .rename(columns={"Resource Name_count": "resources", "Timestamp_min": "first_created", "Timestamp_max": "last_created"})
+            .set_index("Service")
+        )
+        service_summary["creators"] = creator_counts.groupby("Service")["tag"].agg(", ".join)
 
-        # Flattern MultiIndex columns
+        # Join the small per-Service summary (indexed by Service) onto the Top SKUs (one row per SKU)
+        final_df = top_skus_df.join(service_summary, on="Service description", how="left")
+        final_df = final_df.fillna({"creators": "", "resources": 0}).astype({"resources": int})
+        final_df = final_df[["Service description", "SKU description", "Cost ($)", "creators", "resources", "first_created", "last_created"]]
         final_df.columns = ["Service", "SKU", "Total Cost", "Creators (Count)", "Total Resources Created", "First Created", "Last Created"]
         
         # Sort by Cost desc
@@ -165,9 +264,11 @@ def main():
         print(final_df[['Service', 'SKU', 'Total Cost', 'Creators (Count)']].head())
 
         output_file = "gcp_sku_cost_creators_summary.xlsx"
-        final_df.to_excel(output_file, index=False)
+        final_df.to_excel(output_file, index=False, engine="xlsxwriter")
         final_df.to_csv("gcp_sku_cost_creators_summary.csv", index=False)
-        print(f"\nSUCCESS: Generated Aggregated Report '{output_file}'")
+        # Typed, columnar copy of the report for downstream analysis
+        pq.write_table(pa.Table.from_pandas(final_df, preserve_index=False), "gcp_sku_cost_creators_summary.parquet")
+        print(f"\nSUCCESS: Generated Aggregated Report '{output_file}' (+ .csv, .parquet)")
 
 if __name__ == "__main__":
     main()
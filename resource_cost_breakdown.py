@@ -12,68 +12,226 @@ Methods used per service:
   App Engine Flex → gcloud app versions list (90% accurate)
   Cloud Run       → Cloud Monitoring billable_instance_time (95% accurate)
   Cloud Run Funcs → Cloud Monitoring execution_count (90% accurate)
-  Vertex AI       → gcloud ai endpoints list (95% accurate - machine_type × replicas)
+  Vertex AI       → Vertex AI EndpointService list_endpoints (95% accurate - machine_type × replicas)
 """
 import os
 os.environ["GOOGLE_CLOUD_DISABLE_GRPC"] = "true"
 
+import numpy as np
 import pandas as pd
 import config
-import glob
-import json
+import asyncio
+import functools
+import re
+import shelve
+import threading
 import time
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from google.api_core.client_options import ClientOptions
+from google.cloud import aiplatform_v1
 from google.cloud import logging as cloud_logging
 from google.cloud import monitoring_v3
 from google.protobuf.duration_pb2 import Duration
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional — stdlib json parses the same gcloud output, just slower
+    import json
+    _json_loads = json.loads
+
 
 # ============================================================
 # STEP 1: Read Billing CSV & Get Top 10 SKUs
 # ============================================================
+# Output CSVs written by this tool (and generate_report.py) — never treat these as billing input
+EXCLUDED_CSV_MARKERS = ("gcp_created_resources", "top_10", "gcp_creation_audit_report", "gcp_", "resource_cost", "person_cost")
+BILLING_CSV_COLUMNS = ["Service description", "SKU description", "Usage amount", "Usage unit", "Cost ($)"]
+BILLING_COLUMN_NAMES = {
+    "Service description": "Service", "SKU description": "SKU",
+    "Usage amount": "Usage", "Usage unit": "Unit", "Cost ($)": "Cost",
+}
+
+
 def find_billing_csv():
-    csv_files = glob.glob("*.csv")
-    input_csvs = [f for f in csv_files if "gcp_" not in f and "top_10" not in f and "resource_cost" not in f and "person_cost" not in f]
-    return input_csvs[0] if input_csvs else None
+    """Billing CSV in the current folder — or its parquet cache when that is at least as new."""
+    with os.scandir(".") as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith(".csv") and entry.is_file() and not any(marker in name for marker in EXCLUDED_CSV_MARKERS):
+                parquet_path = name[:-len(".csv")] + ".parquet"
+                if os.path.isfile(parquet_path) and os.path.getmtime(parquet_path) >= entry.stat().st_mtime:
+                    return parquet_path
+                return name
+    return None
+
+
+def read_billing_csv(csv_path):
+    """Parse the billing CSV (needed columns, numbers cleaned) and cache it as parquet next to it."""
+    # Only parse the columns we need; numeric columns are read as text ("1,234.56") and cleaned once
+    df = pd.read_csv(
+        csv_path,
+        engine="pyarrow",
+        usecols=BILLING_CSV_COLUMNS,
+        dtype={col: "string" for col in BILLING_CSV_COLUMNS},
+    )
+    df["Cost ($)"] = df["Cost ($)"].str.replace(r'[$,]', '', regex=True).astype(float)
+    df["Usage amount"] = df["Usage amount"].str.replace(r'[$,]', '', regex=True).astype(float)
+    
+    try:
+        df.to_parquet(csv_path[:-len(".csv")] + ".parquet", compression="zstd", index=False)
+    except Exception as e:
+        print(f"  Could not write parquet cache: {e}")
+    return df
 
 
 def get_top_skus(csv_path):
     print(f"Reading: {csv_path}")
-    df = pd.read_csv(csv_path)
-    df["Cost ($)"] = df["Cost ($)"].replace(r'[$,]', '', regex=True).astype(float)
-    df["Usage amount"] = df["Usage amount"].replace(r'[$,]', '', regex=True).astype(float)
+    if csv_path.endswith(".parquet"):
+        # Already cleaned on a previous run
+        df = pd.read_parquet(csv_path, engine="pyarrow", columns=BILLING_CSV_COLUMNS)
+    else:
+        df = read_billing_csv(csv_path)
     df = df.sort_values("Cost ($)", ascending=False).head(10)
+    # Short identifier-safe names so rows can be iterated as plain namedtuples
+    df = df.rename(columns=BILLING_COLUMN_NAMES)
     
     print("\n--- Top 10 SKUs ---")
-    for i, (_, row) in enumerate(df.iterrows(), 1):
-        unit_price = row["Cost ($)"] / row["Usage amount"] if row["Usage amount"] > 0 else 0
-        print(f"  {i:>2}. ${row['Cost ($)']:>8.2f}  {row['Service description'][:25]:25s} | {row['SKU description'][:50]}")
-        print(f"      Usage: {row['Usage amount']:>12,.2f} {row['Usage unit']:15s} | Unit: ${unit_price:.8f}")
+    for i, row in enumerate(df.itertuples(index=False), 1):
+        unit_price = row.Cost / row.Usage if row.Usage > 0 else 0
+        print(f"  {i:>2}. ${row.Cost:>8.2f}  {row.Service[:25]:25s} | {row.SKU[:50]}")
+        print(f"      Usage: {row.Usage:>12,.2f} {row.Unit:15s} | Unit: ${unit_price:.8f}")
     return df
 
 
 # ============================================================
 # HELPER: Run gcloud command and parse JSON output
 # ============================================================
+# Listing commands shared by the breakdown methods and the up-front prefetch.
+# --format projections keep only the fields we read (smaller output, faster parse);
+# --quiet disables prompts so gcloud never waits on input.
+SQL_INSTANCES_CMD = f'gcloud sql instances list --project={config.PROJECT_ID} --format="json(name,settings.tier,region,state)" --quiet'
+COMPUTE_INSTANCES_CMD = f'gcloud compute instances list --project={config.PROJECT_ID} --format="json(name,status,zone,machineType)" --quiet'
+COMPUTE_DISKS_CMD = f'gcloud compute disks list --project={config.PROJECT_ID} --format="json(name,sizeGb,type,zone)" --quiet'
+APP_VERSIONS_CMD = f'gcloud app versions list --project={config.PROJECT_ID} --format="json(service,id,environment,version.servingStatus,version.resources)" --quiet'
+VERTEX_AI_REGIONS = ["us-central1", "us-east1", "us-west1", "europe-west1"]
+
+# Parsed output per command — each distinct gcloud command runs once per program run
+_gcloud_cache = {}
+
+# ...and is also kept on disk for config.GCLOUD_CACHE_TTL_SECONDS, so reruns within
+# a few minutes skip the gcloud round-trips entirely (shelve is not thread-safe → lock)
+GCLOUD_CACHE_FILE = ".gcloud_cache"
+_gcloud_disk_lock = threading.Lock()
+
+
+def _load_gcloud_disk_cache(cmd):
+    if config.GCLOUD_CACHE_TTL_SECONDS <= 0:
+        return None
+    try:
+        with _gcloud_disk_lock, shelve.open(GCLOUD_CACHE_FILE) as cache:
+            entry = cache.get(cmd)
+    except Exception as e:
+        print(f"  gcloud cache read error: {e}")
+        return None
+    if entry and time.time() - entry[0] < config.GCLOUD_CACHE_TTL_SECONDS:
+        return entry[1]
+    return None
+
+
+def _save_gcloud_disk_cache(cmd, output):
+    if config.GCLOUD_CACHE_TTL_SECONDS <= 0:
+        return
+    try:
+        with _gcloud_disk_lock, shelve.open(GCLOUD_CACHE_FILE) as cache:
+            cache[cmd] = (time.time(), output)
+    except Exception as e:
+        print(f"  gcloud cache write error: {e}")
+
+
+def _cached_gcloud(cmd):
+    """Return (True, output) if cmd already ran this run or recently on disk, else (False, None)."""
+    if cmd in _gcloud_cache:
+        return True, _gcloud_cache[cmd]
+    output = _load_gcloud_disk_cache(cmd)
+    if output is not None:
+        print(f"  Cached: {cmd[:80]}...")
+        _gcloud_cache[cmd] = output
+        return True, output
+    return False, None
+
+
+def _store_gcloud(cmd, output):
+    _gcloud_cache[cmd] = output
+    if output is not None:  # Never persist failures — retry them next run
+        _save_gcloud_disk_cache(cmd, output)
+
+
+def _parse_gcloud_output(returncode, stdout, stderr):
+    if returncode != 0:
+        print(f"  gcloud error: {stderr[:200]}")
+        return None
+    if not stdout.strip():
+        return []
+    return _json_loads(stdout)
+
+
 def run_gcloud(cmd):
-    """Run a gcloud command and return parsed JSON output."""
+    """Run a gcloud command and return parsed JSON output (cached per distinct command)."""
+    hit, output = _cached_gcloud(cmd)
+    if hit:
+        return output
     try:
         print(f"  Running: {cmd[:80]}...")
         result = subprocess.run(
             cmd, shell=True, capture_output=True, text=True, timeout=60
         )
-        if result.returncode != 0:
-            print(f"  gcloud error: {result.stderr[:200]}")
-            return None
-        if not result.stdout.strip():
-            return []
-        return json.loads(result.stdout)
+        output = _parse_gcloud_output(result.returncode, result.stdout, result.stderr)
+    except Exception as e:
+        print(f"  gcloud exception: {e}")
+        output = None
+    _store_gcloud(cmd, output)
+    return output
+
+
+async def run_gcloud_async(cmd):
+    """Async twin of run_gcloud, so independent gcloud calls can overlap."""
+    try:
+        print(f"  Running: {cmd[:80]}...")
+        proc = await asyncio.create_subprocess_shell(
+            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=60)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()  # reap the killed gcloud process
+            raise
+        return _parse_gcloud_output(
+            proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+        )
     except Exception as e:
         print(f"  gcloud exception: {e}")
         return None
 
 
+async def _run_gcloud_all(cmds):
+    return await asyncio.gather(*[run_gcloud_async(cmd) for cmd in cmds])
+
+
+def prefetch_gcloud(cmds):
+    """Run all not-yet-cached gcloud commands concurrently and cache their output."""
+    pending = [cmd for cmd in dict.fromkeys(cmds) if not _cached_gcloud(cmd)[0]]
+    if not pending:
+        return
+    print(f"\nPrefetching {len(pending)} gcloud listings concurrently...")
+    for cmd, output in zip(pending, asyncio.run(_run_gcloud_all(pending))):
+        _store_gcloud(cmd, output)
+
+
 # ============================================================
 # METHOD 1: Cloud SQL — gcloud sql instances list
 # ============================================================
@@ -82,60 +240,36 @@ def get_cloudsql_breakdown(total_cost, total_usage, usage_unit, sku_name):
     Cloud SQL instances are always-on. Cost = machine_type × hours.
     Since all instances run 24/7, cost is proportional to machine size.
     """
-    instances = run_gcloud(
-        f'gcloud sql instances list --project={config.PROJECT_ID} --format=json'
-    )
+    instances = run_gcloud(SQL_INSTANCES_CMD)
     if not instances:
         return None
     
-    results = []
     # For vCPU SKU, split by CPU count; for RAM SKU, split by memory
     is_cpu = "vCPU" in sku_name or "vcpu" in sku_name.lower()
-    is_ram = "RAM" in sku_name or "ram" in sku_name.lower()
     
-    total_weight = 0
-    instance_weights = {}
+    df = pd.json_normalize(instances).reindex(columns=["name", "settings.tier", "region", "state"])
+    df = df.fillna({"name": "unknown", "settings.tier": "unknown", "region": "unknown", "state": "RUNNABLE"})
     
-    for inst in instances:
-        name = inst.get("name", "unknown")
-        tier = inst.get("settings", {}).get("tier", "unknown")
-        region = inst.get("region", "unknown")
-        state = inst.get("state", "RUNNABLE")
-        
-        # Extract CPU/RAM from tier (e.g., "db-custom-2-7680" = 2 CPUs, 7680MB RAM)
-        cpu = 1
-        ram_mb = 3840
-        if "custom" in tier:
-            parts = tier.split("-")
-            if len(parts) >= 3:
-                try:
-                    cpu = int(parts[2])
-                    ram_mb = int(parts[3]) if len(parts) > 3 else 3840
-                except (ValueError, IndexError):
-                    pass
-        
-        weight = cpu if is_cpu else (ram_mb / 1024)  # GiB for RAM
-        instance_weights[name] = {
-            "weight": weight, "tier": tier, "region": region, "state": state
-        }
-        if state == "RUNNABLE":
-            total_weight += weight
+    # Extract CPU/RAM from tier (e.g., "db-custom-2-7680" = 2 CPUs, 7680MB RAM)
+    specs = df["settings.tier"].str.extract(r"custom-(?P<cpu>\d+)(?:-(?P<ram_mb>\d+))?")
+    cpu = pd.to_numeric(specs["cpu"]).fillna(1)
+    ram_mb = pd.to_numeric(specs["ram_mb"]).fillna(3840)
+    df["weight"] = cpu if is_cpu else ram_mb / 1024  # GiB for RAM
     
+    running = df[df["state"] == "RUNNABLE"]
+    total_weight = running["weight"].sum()
     if total_weight == 0:
         return None
     
-    for name, info in instance_weights.items():
-        if info["state"] != "RUNNABLE":
-            continue
-        share = info["weight"] / total_weight
-        actual_cost = round(total_cost * share, 2)
-        resource_detail = f"{name} ({info['tier']}, {info['region']})"
-        
+    shares = running["weight"] / total_weight
+    results = []
+    for name, tier, region, share in zip(running["name"], running["settings.tier"], running["region"], shares):
+        share = float(share)
         results.append({
-            "Resource": resource_detail,
+            "Resource": f"{name} ({tier}, {region})",
             "Resource Usage": round(total_usage * share, 2),
             "Usage Share %": round(share * 100, 2),
-            "Actual Cost": actual_cost,
+            "Actual Cost": round(total_cost * share, 2),
             "Method": "gcloud sql instances list (exact)"
         })
     
@@ -151,64 +285,44 @@ def get_compute_vm_breakdown(total_cost, total_usage, usage_unit, sku_name):
     if "PD Capacity" in sku_name or "Persistent Disk" in sku_name or "SSD backed" in sku_name:
         return get_compute_disk_breakdown(total_cost, total_usage, usage_unit, sku_name)
     
-    instances = run_gcloud(
-        f'gcloud compute instances list --project={config.PROJECT_ID} --format=json'
-    )
+    instances = run_gcloud(COMPUTE_INSTANCES_CMD)
     if not instances:
         return None
     
     is_cpu = "Core" in sku_name or "CPU" in sku_name or "Cpu" in sku_name
-    is_ram = "Ram" in sku_name or "ram" in sku_name or "Memory" in sku_name
     
-    total_weight = 0
-    instance_data = {}
+    df = pd.json_normalize(instances).reindex(columns=["name", "status", "zone", "machineType"])
+    df = df.fillna({"name": "unknown", "status": "TERMINATED", "zone": "", "machineType": ""})
+    df["zone"] = df["zone"].str.rsplit("/", n=1).str[-1]
+    machine_type = df["machineType"].str.rsplit("/", n=1).str[-1]
+    df["machine_type"] = machine_type
     
-    for inst in instances:
-        name = inst.get("name", "unknown")
-        status = inst.get("status", "TERMINATED")
-        zone = inst.get("zone", "").split("/")[-1]
-        machine_type = inst.get("machineType", "").split("/")[-1]
-        
-        # Parse machine type for CPU/RAM (e.g., "n2-standard-4" = 4 CPUs, 16GB RAM)
-        cpu = 1
-        ram_gb = 4
-        parts = machine_type.split("-")
-        if len(parts) >= 3:
-            try:
-                cpu = int(parts[-1])
-                # Standard ratio: 4GB per vCPU for standard, 1GB for highmem varies
-                if "highmem" in machine_type:
-                    ram_gb = cpu * 8
-                elif "highcpu" in machine_type:
-                    ram_gb = max(cpu, 1)
-                else:
-                    ram_gb = cpu * 4
-            except ValueError:
-                pass
-        
-        weight = cpu if is_cpu else ram_gb
-        instance_data[name] = {
-            "weight": weight, "machine_type": machine_type, 
-            "zone": zone, "status": status
-        }
-        if status == "RUNNING":
-            total_weight += weight
+    # Parse machine type for CPU/RAM (e.g., "n2-standard-4" = 4 CPUs, 16GB RAM)
+    # Unparseable types (e.g., "e2-micro") fall back to 1 CPU / 4GB
+    cpu = pd.to_numeric(machine_type.str.extract(r"-(\d+)$")[0]).where(machine_type.str.count("-") >= 2)
+    # Standard ratio: 4GB per vCPU for standard, 1GB for highmem varies
+    ram_gb = np.select(
+        [machine_type.str.contains("highmem"), machine_type.str.contains("highcpu")],
+        [cpu * 8, cpu.clip(lower=1)],
+        cpu * 4,
+    )
+    ram_gb = pd.Series(ram_gb, index=df.index).fillna(4)
+    df["weight"] = cpu.fillna(1) if is_cpu else ram_gb
     
+    running = df[df["status"] == "RUNNING"]
+    total_weight = running["weight"].sum()
     if total_weight == 0:
         return None
     
+    shares = running["weight"] / total_weight
     results = []
-    for name, info in instance_data.items():
-        if info["status"] != "RUNNING":
-            continue
-        share = info["weight"] / total_weight
-        actual_cost = round(total_cost * share, 2)
-        
+    for name, mtype, zone, share in zip(running["name"], running["machine_type"], running["zone"], shares):
+        share = float(share)
         results.append({
-            "Resource": f"{name} ({info['machine_type']}, {info['zone']})",
+            "Resource": f"{name} ({mtype}, {zone})",
             "Resource Usage": round(total_usage * share, 2),
             "Usage Share %": round(share * 100, 2),
-            "Actual Cost": actual_cost,
+            "Actual Cost": round(total_cost * share, 2),
             "Method": "gcloud compute instances list (exact)"
         })
     
@@ -218,44 +332,34 @@ def get_compute_vm_breakdown(total_cost, total_usage, usage_unit, sku_name):
 def get_compute_disk_breakdown(total_cost, total_usage, usage_unit, sku_name):
     """Persistent Disks — cost is directly proportional to disk size."""
     
-    disks = run_gcloud(
-        f'gcloud compute disks list --project={config.PROJECT_ID} --format=json'
-    )
+    disks = run_gcloud(COMPUTE_DISKS_CMD)
     if not disks:
         return None
     
-    total_size = 0
-    disk_data = {}
+    df = pd.json_normalize(disks).reindex(columns=["name", "sizeGb", "type", "zone"])
+    df = df.fillna({"name": "unknown", "sizeGb": 0, "type": "", "zone": ""})
+    df["size_gb"] = pd.to_numeric(df["sizeGb"]).astype(int)  # sizeGb comes back as a string
+    df["type"] = df["type"].str.rsplit("/", n=1).str[-1]
+    df["zone"] = df["zone"].str.rsplit("/", n=1).str[-1]
     
-    for disk in disks:
-        name = disk.get("name", "unknown")
-        size_gb = int(disk.get("sizeGb", 0))
-        disk_type = disk.get("type", "").split("/")[-1]
-        zone = disk.get("zone", "").split("/")[-1]
-        
-        # Filter by disk type matching the SKU
-        is_ssd_sku = "SSD" in sku_name
-        is_ssd_disk = "ssd" in disk_type.lower() or "pd-ssd" in disk_type.lower() or "pd-balanced" in disk_type.lower()
-        
-        if is_ssd_sku and not is_ssd_disk:
-            continue
-        
-        disk_data[name] = {"size_gb": size_gb, "type": disk_type, "zone": zone}
-        total_size += size_gb
+    # Filter by disk type matching the SKU
+    if "SSD" in sku_name:
+        disk_type = df["type"].str.lower()
+        df = df[disk_type.str.contains("ssd") | disk_type.str.contains("pd-balanced")]
     
+    total_size = df["size_gb"].sum()
     if total_size == 0:
         return None
     
+    shares = df["size_gb"] / total_size
     results = []
-    for name, info in disk_data.items():
-        share = info["size_gb"] / total_size
-        actual_cost = round(total_cost * share, 2)
-        
+    for name, size_gb, dtype, zone, share in zip(df["name"], df["size_gb"], df["type"], df["zone"], shares):
+        share = float(share)
         results.append({
-            "Resource": f"{name} ({info['size_gb']}GB {info['type']}, {info['zone']})",
+            "Resource": f"{name} ({size_gb}GB {dtype}, {zone})",
             "Resource Usage": round(total_usage * share, 2),
             "Usage Share %": round(share * 100, 2),
-            "Actual Cost": actual_cost,
+            "Actual Cost": round(total_cost * share, 2),
             "Method": "gcloud compute disks list (exact)"
         })
     
@@ -263,16 +367,15 @@ def get_compute_disk_breakdown(total_cost, total_usage, usage_unit, sku_name):
 
 
 # ============================================================
-# METHOD 3: App Engine Flex — gcloud app versions describe
+# METHOD 3: App Engine Flex — gcloud app versions list (+ describe)
 # ============================================================
-def get_appengine_breakdown(total_cost, total_usage, usage_unit, sku_name):
-    """App Engine Flex — get each version's CPU/RAM from describe command."""
+@functools.lru_cache(maxsize=None)
+def get_appengine_version_details():
+    """Collect every App Engine Flex version's details once → {(service, version_id): detail}."""
     
-    versions = run_gcloud(
-        f'gcloud app versions list --project={config.PROJECT_ID} --format=json'
-    )
+    versions = run_gcloud(APP_VERSIONS_CMD)
     if not versions:
-        return None
+        return {}
     
     # Filter to Flex versions only
     flex_versions = []
@@ -282,23 +385,49 @@ def get_appengine_breakdown(total_cost, total_usage, usage_unit, sku_name):
         if "FLEX" in env_name.upper():
             flex_versions.append(v)
     
-    if not flex_versions:
+    # The list response usually carries servingStatus/resources already;
+    # only describe the versions where it doesn't
+    keys = [(v.get("service", "default"), v.get("id", "unknown")) for v in flex_versions]
+    listed = {}
+    for key, v in zip(keys, flex_versions):
+        version = v.get("version") or {}
+        if "servingStatus" in version and "resources" in version:
+            listed[key] = version
+    
+    # Describe the rest concurrently — each call is an independent gcloud round-trip
+    to_describe = [key for key in keys if key not in listed]
+    described = {}
+    if to_describe:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = executor.map(
+                lambda key: run_gcloud(
+                    f'gcloud app versions describe {key[1]} --service={key[0]} --project={config.PROJECT_ID} --format="json(servingStatus,resources)" --quiet'
+                ),
+                to_describe,
+            )
+            described = dict(zip(to_describe, results))
+    
+    details = {}
+    for key in keys:
+        detail = listed.get(key) or described.get(key)
+        if detail:
+            details[key] = detail
+    
+    return details
+
+
+def get_appengine_breakdown(total_cost, total_usage, usage_unit, sku_name):
+    """App Engine Flex — get each version's CPU/RAM from the list/describe details."""
+    
+    version_details = get_appengine_version_details()
+    if not version_details:
         return None
     
-    # Get detailed info (servingStatus, resources) for each flex version
+    is_cpu = "Core" in sku_name or "CPU" in sku_name or "Cpu" in sku_name
     total_weight = 0
     version_data = {}
     
-    for v in flex_versions:
-        service = v.get("service", "default")
-        version_id = v.get("id", "unknown")
-        
-        detail = run_gcloud(
-            f'gcloud app versions describe {version_id} --service={service} --project={config.PROJECT_ID} --format=json'
-        )
-        if not detail:
-            continue
-        
+    for (service, version_id), detail in version_details.items():
         status = detail.get("servingStatus", "STOPPED")
         if status != "SERVING":
             continue
@@ -308,8 +437,6 @@ def get_appengine_breakdown(total_cost, total_usage, usage_unit, sku_name):
         memory_gb = resources.get("memoryGb", 0.5)
         
         name = f"{service}/{version_id}"
-        
-        is_cpu = "Core" in sku_name or "CPU" in sku_name or "Cpu" in sku_name
         weight = cpu if is_cpu else memory_gb
         
         version_data[name] = {"weight": weight, "cpu": cpu, "memory_gb": memory_gb}
@@ -334,6 +461,34 @@ def get_appengine_breakdown(total_cost, total_usage, usage_unit, sku_name):
     return results
 
 
+# ============================================================
+# HELPER: Cloud Monitoring client & aggregated points
+# ============================================================
+_monitoring_client = None
+_monitoring_client_lock = threading.Lock()
+
+
+def get_monitoring_client():
+    """One shared MetricServiceClient (channel + auth set up once per run)."""
+    global _monitoring_client
+    with _monitoring_client_lock:  # services are broken down in parallel threads
+        if _monitoring_client is None:
+            _monitoring_client = monitoring_v3.MetricServiceClient()
+    return _monitoring_client
+
+
+# The metric's value type is known at each call site, so pick the accessor there
+def _numeric_total(point):
+    """Value of an INT64/DOUBLE point (e.g. billable_instance_time, execution_count)."""
+    return point.value.int64_value or point.value.double_value
+
+
+def _distribution_total(point):
+    """Sum of a DISTRIBUTION point (e.g. execution_times) = mean × count."""
+    dist = point.value.distribution_value
+    return dist.mean * dist.count if dist.count > 0 else 0
+
+
 # ============================================================
 # METHOD 4: Cloud Run — Cloud Monitoring (aggregated)
 # ============================================================
@@ -344,7 +499,7 @@ def get_cloudrun_breakdown(total_cost, total_usage, usage_unit, sku_name):
     """
     print(f"  Querying Cloud Monitoring for Cloud Run billable_instance_time...")
     
-    client = monitoring_v3.MetricServiceClient()
+    client = get_monitoring_client()
     project_path = f"projects/{config.PROJECT_ID}"
     
     now = datetime.now(timezone.utc)
@@ -379,7 +534,8 @@ def get_cloudrun_breakdown(total_cost, total_usage, usage_unit, sku_name):
         usage_by_service = {}
         for ts in results:
             service_name = dict(ts.resource.labels).get("service_name", "unknown")
-            total_val = sum(p.value.double_value or p.value.int64_value for p in ts.points)
+            # alignment_period spans the whole lookback → one aggregated point per series
+            total_val = _numeric_total(ts.points[0]) if ts.points else 0
             if total_val > 0:
                 usage_by_service[service_name] = usage_by_service.get(service_name, 0) + total_val
         
@@ -415,7 +571,7 @@ def get_cloudfunctions_breakdown(total_cost, total_usage, usage_unit, sku_name):
     
     print(f"  Querying Cloud Monitoring for Cloud Functions...")
     
-    client = monitoring_v3.MetricServiceClient()
+    client = get_monitoring_client()
     project_path = f"projects/{config.PROJECT_ID}"
     
     now = datetime.now(timezone.utc)
@@ -450,11 +606,8 @@ def get_cloudfunctions_breakdown(total_cost, total_usage, usage_unit, sku_name):
         usage_by_fn = {}
         for ts in results:
             fn_name = dict(ts.resource.labels).get("function_name", "unknown")
-            total_val = sum(p.value.double_value or p.value.int64_value or 
-                          p.value.distribution_value.mean * p.value.distribution_value.count
-                          if hasattr(p.value, 'distribution_value') and p.value.distribution_value.count > 0
-                          else 0
-                          for p in ts.points)
+            # alignment_period spans the whole lookback → one aggregated point per series
+            total_val = _distribution_total(ts.points[0]) if ts.points else 0
             if total_val > 0:
                 usage_by_fn[fn_name] = usage_by_fn.get(fn_name, 0) + total_val
         
@@ -473,7 +626,7 @@ def get_cloudfunctions_breakdown(total_cost, total_usage, usage_unit, sku_name):
             )
             for ts in results2:
                 fn_name = dict(ts.resource.labels).get("function_name", "unknown")
-                total_val = sum(p.value.int64_value or p.value.double_value for p in ts.points)
+                total_val = _numeric_total(ts.points[0]) if ts.points else 0
                 if total_val > 0:
                     usage_by_fn[fn_name] = usage_by_fn.get(fn_name, 0) + total_val
         
@@ -500,76 +653,76 @@ def get_cloudfunctions_breakdown(total_cost, total_usage, usage_unit, sku_name):
 
 
 # ============================================================
-# METHOD 6: Vertex AI — gcloud ai endpoints list (exact)
+# METHOD 6: Vertex AI — EndpointService list_endpoints (exact)
 # ============================================================
-# Machine type CPU counts for N1 series
-N1_CPU_MAP = {
-    "n1-standard-1": 1, "n1-standard-2": 2, "n1-standard-4": 4,
-    "n1-standard-8": 8, "n1-standard-16": 16, "n1-standard-32": 32,
-    "n1-standard-64": 64, "n1-standard-96": 96,
-    "n1-highmem-2": 2, "n1-highmem-4": 4, "n1-highmem-8": 8,
-    "n1-highmem-16": 16, "n1-highmem-32": 32, "n1-highmem-64": 64,
-    "n1-highcpu-2": 2, "n1-highcpu-4": 4, "n1-highcpu-8": 8,
-    "n1-highcpu-16": 16, "n1-highcpu-32": 32, "n1-highcpu-64": 64,
-}
-N1_RAM_MAP = {  # in GB
-    "n1-standard-1": 3.75, "n1-standard-2": 7.5, "n1-standard-4": 15,
-    "n1-standard-8": 30, "n1-standard-16": 60, "n1-standard-32": 120,
-    "n1-standard-64": 240, "n1-standard-96": 360,
-    "n1-highmem-2": 13, "n1-highmem-4": 26, "n1-highmem-8": 52,
-    "n1-highmem-16": 104, "n1-highmem-32": 208, "n1-highmem-64": 416,
-    "n1-highcpu-2": 1.8, "n1-highcpu-4": 3.6, "n1-highcpu-8": 7.2,
-    "n1-highcpu-16": 14.4, "n1-highcpu-32": 28.8, "n1-highcpu-64": 57.6,
+# N1 machine specs: machine type → (vCPUs, RAM in GB), derived from the per-family GB/vCPU ratio
+_N1_RAM_PER_CPU = {"standard": 3.75, "highmem": 6.5, "highcpu": 0.9}
+_N1_CORE_COUNTS = [1, 2, 4, 8, 16, 32, 64, 96]
+N1_SPECS = {
+    f"n1-{family}-{cpus}": (cpus, round(cpus * ratio, 2))
+    for family, ratio in _N1_RAM_PER_CPU.items() for cpus in _N1_CORE_COUNTS
 }
+N1_DEFAULT_SPEC = N1_SPECS["n1-standard-2"]
 
-def get_vertexai_breakdown(total_cost, total_usage, usage_unit, sku_name):
-    """
-    Vertex AI — use gcloud ai endpoints list to get machine type + replicas.
-    Cost = Replicas × CPUs (or RAM) per machine × hours running.
-    """
-    is_cpu = "Core" in sku_name or "CPU" in sku_name
-    is_ram = "Ram" in sku_name or "ram" in sku_name or "Memory" in sku_name
-    
-    # Try multiple regions
-    all_endpoints = []
-    for region in ["us-central1", "us-east1", "us-west1", "europe-west1"]:
-        endpoints = run_gcloud(
-            f'gcloud ai endpoints list --project={config.PROJECT_ID} --region={region} --format=json 2>NUL'
+
+def _list_region_endpoints(region):
+    """Vertex AI endpoints in one region via the regional EndpointService API → [(region, endpoint)] (None on error)."""
+    try:
+        # REST transport: this script avoids gRPC (IOCP/socket errors on Windows)
+        client = aiplatform_v1.EndpointServiceClient(
+            client_options=ClientOptions(api_endpoint=f"{region}-aiplatform.googleapis.com"),
+            transport="rest",
         )
-        if endpoints:
-            for ep in endpoints:
-                ep["_region"] = region
-            all_endpoints.extend(endpoints)
-    
-    if not all_endpoints:
-        print(f"  No Vertex AI endpoints found.")
+        parent = f"projects/{config.PROJECT_ID}/locations/{region}"
+        return [(region, ep) for ep in client.list_endpoints(parent=parent)]
+    except Exception as e:
+        print(f"  Vertex AI list_endpoints error ({region}): {str(e)[:100]}")
         return None
+
+
+# Endpoints across all regions, kept once every region listed cleanly
+_vertex_endpoints = None
+
+
+def _list_vertex_endpoints():
+    """All Vertex AI endpoints across VERTEX_AI_REGIONS (fetched once, shared by every Vertex SKU)."""
+    global _vertex_endpoints
+    if _vertex_endpoints is not None:
+        return _vertex_endpoints
+    
+    # Try multiple regions — listed concurrently, each region has its own API endpoint
+    with ThreadPoolExecutor(max_workers=len(VERTEX_AI_REGIONS)) as executor:
+        region_endpoints = list(executor.map(_list_region_endpoints, VERTEX_AI_REGIONS))
+    all_endpoints = [pair for endpoints in region_endpoints if endpoints for pair in endpoints]
     
+    # Don't keep a listing with a failed region — the next Vertex SKU retries
+    if None not in region_endpoints:
+        _vertex_endpoints = all_endpoints
+    return all_endpoints
+
+
+def _weight_endpoints(endpoints, is_cpu):
+    """Weight each deployed endpoint by replicas × CPUs (or RAM) → ({label: info}, total_weight)."""
     total_weight = 0
     endpoint_data = {}
     
-    for ep in all_endpoints:
-        display_name = ep.get("displayName", "unknown")
-        endpoint_id = ep.get("name", "").split("/")[-1]
-        region = ep.get("_region", "unknown")
-        deployed_models = ep.get("deployedModels", [])
+    for region, ep in endpoints:
+        display_name = ep.display_name or "unknown"
+        endpoint_id = ep.name.split("/")[-1]
         
-        if not deployed_models:
+        if not ep.deployed_models:
             continue  # No active model = no cost
         
         ep_weight = 0
         ep_details = []
         
-        for model in deployed_models:
-            dedicated = model.get("dedicatedResources", {})
-            machine_spec = dedicated.get("machineSpec", {})
-            machine_type = machine_spec.get("machineType", "n1-standard-2")
-            min_replicas = dedicated.get("minReplicaCount", 1)
+        for model in ep.deployed_models:
+            dedicated = model.dedicated_resources
+            machine_type = dedicated.machine_spec.machine_type or "n1-standard-2"
+            min_replicas = dedicated.min_replica_count or 1
             
-            if is_cpu:
-                per_machine = N1_CPU_MAP.get(machine_type, 2)
-            else:
-                per_machine = N1_RAM_MAP.get(machine_type, 7.5)
+            cpus, ram_gb = N1_SPECS.get(machine_type, N1_DEFAULT_SPEC)
+            per_machine = cpus if is_cpu else ram_gb
             
             weight = min_replicas * per_machine
             ep_weight += weight
@@ -580,10 +733,28 @@ def get_vertexai_breakdown(total_cost, total_usage, usage_unit, sku_name):
             endpoint_data[key] = {"weight": ep_weight, "endpoint_id": endpoint_id}
             total_weight += ep_weight
     
+    return endpoint_data, total_weight
+
+
+def get_vertexai_breakdown(total_cost, total_usage, usage_unit, sku_name):
+    """
+    Vertex AI — list endpoints via the Vertex AI API to get machine type + replicas.
+    Cost = Replicas × CPUs (or RAM) per machine × hours running.
+    """
+    is_cpu = "Core" in sku_name or "CPU" in sku_name
+    
+    all_endpoints = _list_vertex_endpoints()
+    if not all_endpoints:
+        print(f"  No Vertex AI endpoints found.")
+        return None
+    
+    endpoint_data, total_weight = _weight_endpoints(all_endpoints, is_cpu)
+    
     if total_weight == 0:
         print(f"  No active Vertex AI deployments found.")
         return None
     
+    # Every endpoint is reported (per-endpoint attribution), so a full sort is needed
     results = []
     for name, info in sorted(endpoint_data.items(), key=lambda x: x[1]["weight"], reverse=True):
         share = info["weight"] / total_weight
@@ -594,7 +765,7 @@ def get_vertexai_breakdown(total_cost, total_usage, usage_unit, sku_name):
             "Resource Usage": round(total_usage * share, 2),
             "Usage Share %": round(share * 100, 2),
             "Actual Cost": actual_cost,
-            "Method": "gcloud ai endpoints list (exact: machine_type × replicas)"
+            "Method": "Vertex AI list_endpoints (exact: machine_type × replicas)"
         })
     
     print(f"  Found {len(results)} active Vertex AI endpoints.")
@@ -613,45 +784,132 @@ SERVICE_METHOD_MAP = {
     "Vertex AI": get_vertexai_breakdown,
 }
 
+# gcloud listings each gcloud-backed method needs (prefetched concurrently in main)
+SERVICE_GCLOUD_COMMANDS = {
+    "Cloud SQL": [SQL_INSTANCES_CMD],
+    "Compute Engine": [COMPUTE_INSTANCES_CMD, COMPUTE_DISKS_CMD],
+    "App Engine": [APP_VERSIONS_CMD],
+}
+
 
 # ============================================================
 # Audit Logs: Get creator for each resource
 # ============================================================
-def get_resource_creators(service_name, resource_names):
-    api_service = config.SERVICE_MAPPING.get(service_name)
-    if not api_service:
-        return {}
-    
-    client = cloud_logging.Client(project=config.PROJECT_ID)
-    start_time = datetime.now(timezone.utc) - timedelta(days=config.DAYS_BACK)
-    ts_filter = start_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-    
-    filter_str = f"""
-        logName="projects/{config.PROJECT_ID}/logs/cloudaudit.googleapis.com%2Factivity"
-        AND timestamp >= "{ts_filter}"
+_logging_client = None
+_logging_client_lock = threading.Lock()
+
+# Max number of audit-log scans paging through entries.list at once (be nice to the API)
+MAX_CONCURRENT_AUDIT_SCANS = 2
+_audit_scan_slots = threading.BoundedSemaphore(MAX_CONCURRENT_AUDIT_SCANS)
+
+
+def get_logging_client():
+    """One shared Cloud Logging client (auth + HTTP session set up once per run)."""
+    global _logging_client
+    with _logging_client_lock:  # services are broken down in parallel threads
+        if _logging_client is None:
+            _logging_client = cloud_logging.Client(project=config.PROJECT_ID)
+    return _logging_client
+
+
+# Creation events of one service since the lookback start (shared by creator lookup and fallback)
+AUDIT_FILTER_TMPL = """
+        logName="projects/{project}/logs/cloudaudit.googleapis.com%2Factivity"
+        AND timestamp >= "{ts}"
         AND protoPayload.serviceName="{api_service}"
         AND (protoPayload.methodName:"create" OR protoPayload.methodName:"insert" OR protoPayload.methodName:"deploy")
     """
+
+# Longer resourceName alternations are not pushed into the Logging filter (API filter size limit)
+MAX_RESOURCE_FILTER_CHARS = 10000
+
+
+def _resource_name_pattern(check_names):
+    """Case-insensitive RE2 alternation of resource names for a Logging `=~` filter (None if too long)."""
+    alternation = "|".join(re.escape(name) for name in sorted(check_names))
+    pattern = f"(?i)({alternation})".replace("\\", "\\\\")  # backslashes escaped for the filter string
+    return pattern if len(pattern) <= MAX_RESOURCE_FILTER_CHARS else None
+
+
+@dataclass
+class AuditScan:
+    """One scan of a service's creation audit logs, viewed both ways."""
+    creators_by_resource: dict = field(default_factory=dict)  # resourceName → first creator seen
+    resources_by_creator: dict = field(default_factory=dict)  # creator → {resourceName, ...}
     
-    creators = {}
+    @functools.cached_property
+    def folded_creators(self):
+        """[(casefolded resourceName, its last path segment, creator), ...] — folded once per scan."""
+        folded = []
+        for resource_full, creator in self.creators_by_resource.items():
+            resource_cf = resource_full.casefold()
+            folded.append((resource_cf, resource_cf.rsplit("/", 1)[-1], creator))
+        return folded
+
+
+# Scans per (service, ts_filter, name_pattern) — each distinct query runs once per program run
+_audit_scans = {}
+
+
+def _audit_scan(service_name, ts_filter, name_pattern=None):
+    """Scan a service's creation audit logs (optionally only matching resourceNames) → AuditScan."""
+    key = (service_name, ts_filter, name_pattern)
+    if key in _audit_scans:
+        return _audit_scans[key]
+    
+    client = get_logging_client()
+    filter_str = AUDIT_FILTER_TMPL.format(project=config.PROJECT_ID, ts=ts_filter, api_service=config.SERVICE_MAPPING[service_name])
+    if name_pattern:
+        # Let Logging drop entries for resources we aren't reporting on
+        filter_str += f'    AND protoPayload.resourceName=~"{name_pattern}"\n'
+    
+    scan = AuditScan()
     try:
-        print(f"  Searching Audit Logs for {len(resource_names)} resources...")
-        entries = client.list_entries(filter_=filter_str, page_size=200)
-        for entry in entries:
-            payload = entry.payload
-            if not payload:
-                continue
-            resource_full = payload.get('resourceName', '')
-            creator = payload.get('authenticationInfo', {}).get('principalEmail', 'Unknown')
-            
-            for rname in resource_names:
-                # Match resource name (handle compound names like "service/version")
-                check_name = rname.split(" ")[0].split("/")[-1]  # Get last meaningful part
-                if check_name.lower() in resource_full.lower():
-                    if rname not in creators:
-                        creators[rname] = creator
+        print(f"  Scanning Audit Logs for {service_name}...")
+        with _audit_scan_slots:
+            entries = client.list_entries(filter_=filter_str, page_size=200)
+            for entry in entries:
+                payload = entry.payload
+                if not payload:
+                    continue
+                resource_full = payload.get('resourceName')
+                creator = payload.get('authenticationInfo', {}).get('principalEmail', 'Unknown')
+                if resource_full:
+                    scan.creators_by_resource.setdefault(resource_full, creator)
+                scan.resources_by_creator.setdefault(creator, set()).add(resource_full or 'Unknown')
     except Exception as e:
+        # Don't memoize a failed/partial scan — the next SKU of this service retries
         print(f"  Audit log error: {e}")
+        return scan
+    
+    _audit_scans[key] = scan
+    return scan
+
+
+def get_resource_creators(service_name, resource_names, ts_filter, full_scan=False):
+    if service_name not in config.SERVICE_MAPPING:
+        return {}
+    
+    print(f"  Searching Audit Logs for {len(resource_names)} resources...")
+    # Index resources by their last meaningful part (handle compound names like "service/version")
+    by_check_name = {}
+    for rname in resource_names:
+        check_name = rname.split(" ")[0].split("/")[-1].casefold()
+        by_check_name.setdefault(check_name, []).append(rname)
+    
+    # A full scan of this service (already run, or wanted by the fallback) covers these resources
+    scan = _audit_scans.get((service_name, ts_filter, None))
+    if scan is None:
+        scan = _audit_scan(service_name, ts_filter, None if full_scan else _resource_name_pattern(by_check_name))
+    
+    creators = {}
+    for resource_cf, last_segment, creator in scan.folded_creators:
+        matches = by_check_name.get(last_segment)
+        if matches is None:
+            # Last path segment isn't an exact hit → fall back to substring matching
+            matches = [rname for check_name, rnames in by_check_name.items() if check_name in resource_cf for rname in rnames]
+        for rname in matches:
+            creators.setdefault(rname, creator)
     
     print(f"  Found creators for {len(creators)}/{len(resource_names)} resources.")
     return creators
@@ -660,38 +918,11 @@ def get_resource_creators(service_name, resource_names):
 # ============================================================
 # Fallback: Proportional estimate from Audit Logs
 # ============================================================
-def get_fallback(service_name, total_cost):
-    api_service = config.SERVICE_MAPPING.get(service_name)
-    if not api_service:
-        return []
-    
-    client = cloud_logging.Client(project=config.PROJECT_ID)
-    start_time = datetime.now(timezone.utc) - timedelta(days=config.DAYS_BACK)
-    ts_filter = start_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-    
-    filter_str = f"""
-        logName="projects/{config.PROJECT_ID}/logs/cloudaudit.googleapis.com%2Factivity"
-        AND timestamp >= "{ts_filter}"
-        AND protoPayload.serviceName="{api_service}"
-        AND (protoPayload.methodName:"create" OR protoPayload.methodName:"insert" OR protoPayload.methodName:"deploy")
-    """
-    
-    creator_resources = {}
-    try:
-        entries = client.list_entries(filter_=filter_str, page_size=100)
-        for entry in entries:
-            payload = entry.payload
-            if not payload:
-                continue
-            creator = payload.get('authenticationInfo', {}).get('principalEmail', 'Unknown')
-            resource = payload.get('resourceName', 'Unknown')
-            if creator not in creator_resources:
-                creator_resources[creator] = set()
-            creator_resources[creator].add(resource)
-    except Exception as e:
-        print(f"  Fallback error: {e}")
+def get_fallback(service_name, total_cost, ts_filter):
+    if service_name not in config.SERVICE_MAPPING:
         return []
     
+    creator_resources = _audit_scan(service_name, ts_filter).resources_by_creator
     if not creator_resources:
         return []
     
@@ -710,6 +941,102 @@ def get_fallback(service_name, total_cost):
     return sorted(results, key=lambda x: x["Actual Cost"], reverse=True)
 
 
+# ============================================================
+# PER-SKU BREAKDOWN
+# ============================================================
+# Services are broken down in parallel; a service's SKUs run in order so they
+# reuse that service's cached gcloud / Vertex AI / audit-log lookups
+MAX_PARALLEL_SERVICES = 4
+
+# Columns of the detailed report, in output order
+REPORT_COLUMNS = ["Service", "SKU", "Total SKU Cost", "Unit Price", "Usage Unit",
+                  "Resource", "Resource Usage", "Usage Share %", "Actual Cost",
+                  "Created By", "Method"]
+# Low-cardinality text columns → category (groupby / value_counts work on int codes)
+CATEGORY_COLUMNS = ["Service", "SKU", "Method", "Created By", "Usage Unit"]
+
+
+def get_sku_breakdown(sku_row):
+    """Route one Top SKU to the best method for its service → per-resource breakdown (or None)."""
+    method_fn = SERVICE_METHOD_MAP.get(sku_row.Service)
+    if not method_fn:
+        return None
+    return method_fn(sku_row.Cost, sku_row.Usage, sku_row.Unit, sku_row.SKU)
+
+
+def process_sku(sku_row, breakdown, creators, ts_filter):
+    """Turn one Top SKU's breakdown (+ creators) or audit-log fallback into report rows → (rows, log lines)."""
+    rows = []
+    log = []  # SKUs run in parallel — main prints each SKU's summary in order
+    service = sku_row.Service
+    sku = sku_row.SKU
+    total_cost = sku_row.Cost
+    total_usage = sku_row.Usage
+    usage_unit = sku_row.Unit
+    unit_price = total_cost / total_usage if total_usage > 0 else 0
+    
+    log.append(f"\n{'='*70}")
+    log.append(f"  {service} / {sku[:55]}")
+    log.append(f"  Total: ${total_cost:.2f} | {total_usage:,.2f} {usage_unit} | Unit: ${unit_price:.8f}")
+    log.append(f"{'='*70}")
+    
+    if breakdown:
+        for item in breakdown:
+            item["Service"] = service
+            item["SKU"] = sku
+            item["Total SKU Cost"] = total_cost
+            item["Unit Price"] = unit_price
+            item["Usage Unit"] = usage_unit
+            if "Created By" not in item:
+                item["Created By"] = creators.get(item["Resource"], "Unknown")
+            rows.append(item)
+        
+        log.append(f"  ✅ Breakdown: {len(breakdown)} resources")
+    else:
+        # Fallback to proportional estimate
+        log.append(f"  ⚠️ No direct data. Using audit log proportional estimate...")
+        fallback = get_fallback(service, total_cost, ts_filter)
+        for item in fallback:
+            item["Service"] = service
+            item["SKU"] = sku
+            item["Total SKU Cost"] = total_cost
+            item["Unit Price"] = unit_price
+            item["Usage Unit"] = usage_unit
+            rows.append(item)
+        
+        if fallback:
+            log.append(f"  ✅ Estimated across {len(fallback)} creators")
+        else:
+            rows.append({
+                "Service": service, "SKU": sku, "Total SKU Cost": total_cost,
+                "Unit Price": unit_price, "Usage Unit": usage_unit,
+                "Resource": "No data", "Resource Usage": total_usage,
+                "Usage Share %": 100, "Actual Cost": total_cost,
+                "Created By": "Unknown", "Method": "No data"
+            })
+            log.append(f"  ❌ No data found")
+    
+    return rows, log
+
+
+def process_service_skus(indexed_sku_rows, ts_filter):
+    """Process one service's SKUs in order → [(sku_index, (rows, log lines)), ...]."""
+    service = indexed_sku_rows[0][1].Service
+    breakdowns = [get_sku_breakdown(sku_row) for _, sku_row in indexed_sku_rows]
+    
+    # One audit-log scan for the whole service: filtered to every SKU's resources, or the
+    # full scan when some SKU falls back anyway (the fallback then reuses it)
+    resource_names = list(dict.fromkeys(r["Resource"] for breakdown in breakdowns if breakdown for r in breakdown))
+    creators = {}
+    if resource_names:
+        creators = get_resource_creators(service, resource_names, ts_filter, full_scan=not all(breakdowns))
+    
+    return [
+        (i, process_sku(sku_row, breakdown, creators, ts_filter))
+        for (i, sku_row), breakdown in zip(indexed_sku_rows, breakdowns)
+    ]
+
+
 # ============================================================
 # MAIN
 # ============================================================
@@ -725,98 +1052,67 @@ def main():
         return
     
     top_skus = get_top_skus(csv_path)
-    all_results = []
-    
-    for _, sku_row in top_skus.iterrows():
-        service = sku_row["Service description"]
-        sku = sku_row["SKU description"]
-        total_cost = sku_row["Cost ($)"]
-        total_usage = sku_row["Usage amount"]
-        usage_unit = sku_row["Usage unit"]
-        unit_price = total_cost / total_usage if total_usage > 0 else 0
-        
-        print(f"\n{'='*70}")
-        print(f"  {service} / {sku[:55]}")
-        print(f"  Total: ${total_cost:.2f} | {total_usage:,.2f} {usage_unit} | Unit: ${unit_price:.8f}")
-        print(f"{'='*70}")
-        
-        # Route to the best method for this service
-        method_fn = SERVICE_METHOD_MAP.get(service)
-        breakdown = None
-        
-        if method_fn:
-            breakdown = method_fn(total_cost, total_usage, usage_unit, sku)
-        
-        if breakdown:
-            # Get creators from audit logs
-            resource_names = [r["Resource"] for r in breakdown]
-            creators = get_resource_creators(service, resource_names)
-            
-            for item in breakdown:
-                item["Service"] = service
-                item["SKU"] = sku
-                item["Total SKU Cost"] = total_cost
-                item["Unit Price"] = unit_price
-                item["Usage Unit"] = usage_unit
-                if "Created By" not in item:
-                    item["Created By"] = creators.get(item["Resource"], "Unknown")
-                all_results.append(item)
-            
-            print(f"  ✅ Breakdown: {len(breakdown)} resources")
-        else:
-            # Fallback to proportional estimate
-            print(f"  ⚠️ No direct data. Using audit log proportional estimate...")
-            fallback = get_fallback(service, total_cost)
-            for item in fallback:
-                item["Service"] = service
-                item["SKU"] = sku
-                item["Total SKU Cost"] = total_cost
-                item["Unit Price"] = unit_price
-                item["Usage Unit"] = usage_unit
-                all_results.append(item)
-            
-            if fallback:
-                print(f"  ✅ Estimated across {len(fallback)} creators")
-            else:
-                all_results.append({
-                    "Service": service, "SKU": sku, "Total SKU Cost": total_cost,
-                    "Unit Price": unit_price, "Usage Unit": usage_unit,
-                    "Resource": "No data", "Resource Usage": total_usage,
-                    "Usage Share %": 100, "Actual Cost": total_cost,
-                    "Created By": "Unknown", "Method": "No data"
-                })
-                print(f"  ❌ No data found")
-        
-        time.sleep(1)
+    
+    # Fire all gcloud listings the Top SKUs will need at once instead of one by one
+    prefetch_gcloud(
+        cmd for service in top_skus["Service"].unique()
+        for cmd in SERVICE_GCLOUD_COMMANDS.get(service, [])
+    )
+    
+    # One lookback start for every audit-log query in this run
+    start_time = datetime.now(timezone.utc) - timedelta(days=config.DAYS_BACK)
+    ts_filter = start_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    
+    skus_by_service = {}
+    for i, sku_row in enumerate(top_skus.itertuples(index=False)):
+        skus_by_service.setdefault(sku_row.Service, []).append((i, sku_row))
+    
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_SERVICES) as executor:
+        service_results = list(executor.map(
+            functools.partial(process_service_skus, ts_filter=ts_filter), skus_by_service.values()
+        ))
+    
+    # Back to Top SKU order: print each SKU's summary, collect rows column by column
+    # (no per-row dict → DataFrame inference)
+    results_by_sku = dict(pair for pairs in service_results for pair in pairs)
+    cols = {col: [] for col in REPORT_COLUMNS}
+    for i in sorted(results_by_sku):
+        rows, log = results_by_sku[i]
+        print("\n".join(log))
+        for row in rows:
+            for col, values in cols.items():
+                values.append(row[col])
     
     # ============================================================
     # GENERATE REPORTS
     # ============================================================
-    if all_results:
-        df = pd.DataFrame(all_results)
-        cols = ["Service", "SKU", "Total SKU Cost", "Unit Price", "Usage Unit",
-                "Resource", "Resource Usage", "Usage Share %", "Actual Cost",
-                "Created By", "Method"]
-        df = df[[c for c in cols if c in df.columns]]
+    if cols["Service"]:
+        df = pd.DataFrame(cols)
         df = df.sort_values(["Total SKU Cost", "Actual Cost"], ascending=[False, False])
+        df = df.astype({col: "category" for col in CATEGORY_COLUMNS})
         
-        # Detailed report
-        df.to_excel("resource_cost_breakdown.xlsx", index=False)
-        df.to_csv("resource_cost_breakdown.csv", index=False)
-        
-        # Person summary
-        print(f"\n{'='*70}")
-        print(f"  COST ATTRIBUTION BY PERSON")
-        print(f"{'='*70}")
-        
-        person_df = df.groupby("Created By")["Actual Cost"].sum().reset_index()
-        person_df = person_df.sort_values("Actual Cost", ascending=False)
-        person_df.columns = ["Person", "Total Cost"]
-        
-        for _, row in person_df.iterrows():
-            print(f"  ${row['Total Cost']:>8.2f}  {row['Person']}")
-        
-        person_df.to_excel("person_cost_summary.xlsx", index=False)
+        # Report files share no state → write them in parallel (while the summaries print)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            writes = [
+                executor.submit(df.to_excel, "resource_cost_breakdown.xlsx", index=False, engine="xlsxwriter"),
+                executor.submit(df.to_csv, "resource_cost_breakdown.csv", index=False),
+            ]
+            
+            # Person summary
+            print(f"\n{'='*70}")
+            print(f"  COST ATTRIBUTION BY PERSON")
+            print(f"{'='*70}")
+            
+            person_df = df.groupby("Created By", observed=True)["Actual Cost"].sum().reset_index()
+            person_df = person_df.sort_values("Actual Cost", ascending=False)
+            person_df.columns = ["Person", "Total Cost"]
+            
+            for person, cost in person_df.itertuples(index=False, name=None):
+                print(f"  ${cost:>8.2f}  {person}")
+            
+            writes.append(executor.submit(person_df.to_excel, "person_cost_summary.xlsx", index=False, engine="xlsxwriter"))
+            for write in writes:
+                write.result()  # surface any write error
         
         # Method summary
         print(f"\n  Methods Used:")